@@ -0,0 +1,289 @@
+import gzip
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_login import current_user
+from conexion.conexion import obtener_conexion_mysql
+
+api_v1 = Blueprint("api_v1", __name__, url_prefix="/api/v1")
+
+LIMITE_DEFECTO = 50
+LIMITE_MAXIMO = 200
+MAX_IDS = 100
+
+CAMPOS_PRODUCTO = ("id_producto", "nombre", "categoria", "cantidad", "precio", "activo")
+CAMPOS_COMPRA = ("id_venta", "fecha", "total")
+CAMPOS_VENTA = ("id_venta", "id_usuario", "cliente", "fecha", "total", "detalles")
+
+
+class ErrorApi(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+@api_v1.errorhandler(ErrorApi)
+def manejar_error(e):
+    return jsonify({"error": e.mensaje}), e.estado
+
+
+# ------------------ FUNCIONES AUXILIARES ------------------
+def _catalogo():
+    # app.py registra aquí su obtener_catalogo() para no importar app desde el blueprint
+    return current_app.extensions["catalogo"]()
+
+
+def _a_json(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def _entero(nombre, defecto=None):
+    valor = request.args.get(nombre)
+    if valor is None or valor == "":
+        return defecto
+    try:
+        return int(valor)
+    except ValueError:
+        raise ErrorApi(400, f"'{nombre}' debe ser un número entero")
+
+
+def _limite():
+    limite = _entero("limite", LIMITE_DEFECTO)
+    if limite < 1:
+        raise ErrorApi(400, "'limite' debe ser mayor que 0")
+    return min(limite, LIMITE_MAXIMO)
+
+
+def _ids():
+    """Lista de ids de ?ids=1,2,3 (en el orden pedido, sin repetidos) o None."""
+    valor = request.args.get("ids")
+    if not valor:
+        return None
+    try:
+        ids = list(dict.fromkeys(int(i) for i in valor.split(",") if i.strip()))
+    except ValueError:
+        raise ErrorApi(400, "'ids' debe ser una lista de enteros separados por comas")
+    if not ids:
+        raise ErrorApi(400, "'ids' no puede estar vacío")
+    if len(ids) > MAX_IDS:
+        raise ErrorApi(400, f"Máximo {MAX_IDS} ids por petición")
+    return ids
+
+
+def _campos(permitidos):
+    valor = request.args.get("campos")
+    if not valor:
+        return permitidos
+    campos = tuple(c.strip() for c in valor.split(",") if c.strip())
+    desconocidos = [c for c in campos if c not in permitidos]
+    if desconocidos:
+        raise ErrorApi(400, f"Campos no válidos: {', '.join(desconocidos)}")
+    return campos
+
+
+def _seleccionar(fila, campos):
+    return {c: fila[c] for c in campos}
+
+
+def _usuario_requerido():
+    if not current_user.is_authenticated:
+        raise ErrorApi(401, "Debes iniciar sesión")
+
+
+def _es_personal():
+    return current_user.rol in ("Administrador", "Empleado")
+
+
+def _responder(obtener_datos, version=None, privado=False):
+    """
+    Serializa a JSON con ETag fuerte y gzip si el cliente lo acepta.
+
+    Si se conoce una 'version' de los datos, el ETag se calcula antes de
+    construir la respuesta y un If-None-Match que coincida devuelve 304 sin
+    serializar nada. Si no, el ETag es el hash del cuerpo.
+
+    'privado' marca las respuestas que dependen del usuario en sesión: llevan
+    Cache-Control: private para que ninguna caché compartida las guarde.
+    """
+    comprimir = request.accept_encodings["gzip"] > 0
+    sufijo = "-gz" if comprimir else ""
+
+    if version is not None:
+        etag = hashlib.sha1(f"{version}:{request.full_path}".encode()).hexdigest() + sufijo
+        if request.if_none_match.contains(etag):
+            return _no_modificado(etag, privado)
+
+    cuerpo = json.dumps(obtener_datos(), ensure_ascii=False, separators=(",", ":"), default=_a_json).encode("utf-8")
+
+    if version is None:
+        etag = hashlib.sha1(cuerpo).hexdigest() + sufijo
+        if request.if_none_match.contains(etag):
+            return _no_modificado(etag, privado)
+
+    respuesta = Response(gzip.compress(cuerpo) if comprimir else cuerpo, mimetype="application/json")
+    if comprimir:
+        respuesta.headers["Content-Encoding"] = "gzip"
+    _cabeceras_cache(respuesta, etag, privado)
+    return respuesta
+
+
+def _no_modificado(etag, privado):
+    respuesta = Response(status=304)
+    _cabeceras_cache(respuesta, etag, privado)
+    return respuesta
+
+
+def _cabeceras_cache(respuesta, etag, privado):
+    if privado:
+        respuesta.headers["Vary"] = "Accept-Encoding, Cookie"
+        respuesta.headers["Cache-Control"] = "private"
+    else:
+        respuesta.headers["Vary"] = "Accept-Encoding"
+    respuesta.set_etag(etag)
+
+
+def _pagina(filas, limite, clave):
+    """Recorta filas (se pidieron limite + 1) y calcula el cursor de la siguiente página."""
+    siguiente = filas[limite - 1][clave] if len(filas) > limite else None
+    return filas[:limite], siguiente
+
+
+# ------------------ PRODUCTOS ------------------
+def _producto_a_dict(p):
+    return {
+        "id_producto": p.id_producto,
+        "nombre": p.nombre,
+        "categoria": p.categoria,
+        "cantidad": p.cantidad,
+        "precio": p.precio,
+        "activo": p.activo,
+    }
+
+
+@api_v1.route("/productos")
+def productos():
+    # Un solo snapshot: el ETag y los datos salen de la misma versión
+    catalogo = _catalogo().snapshot()
+    campos = _campos(CAMPOS_PRODUCTO)
+    ids = _ids()
+    despues = _entero("despues")
+    limite = _limite()
+
+    def datos():
+        if ids is not None:
+            encontrados = [catalogo.obtener(i) for i in ids]
+            return {"datos": [_seleccionar(_producto_a_dict(p), campos) for p in encontrados if p is not None]}
+        filas = []
+        for p in catalogo.desde(despues):
+            filas.append(_producto_a_dict(p))
+            if len(filas) > limite:
+                break
+        pagina, siguiente = _pagina(filas, limite, "id_producto")
+        return {"datos": [_seleccionar(f, campos) for f in pagina], "siguiente": siguiente}
+
+    return _responder(datos, version=catalogo.version)
+
+
+@api_v1.route("/productos/<int:id_producto>")
+def producto(id_producto):
+    catalogo = _catalogo().snapshot()
+    campos = _campos(CAMPOS_PRODUCTO)
+    p = catalogo.obtener(id_producto)
+    if p is None:
+        raise ErrorApi(404, "Producto no encontrado")
+    return _responder(lambda: _seleccionar(_producto_a_dict(p), campos), version=catalogo.version)
+
+
+# ------------------ COMPRAS DE UN USUARIO ------------------
+@api_v1.route("/usuarios/<int:id_usuario>/compras")
+def compras_usuario(id_usuario):
+    _usuario_requerido()
+    if current_user.id != id_usuario and not _es_personal():
+        raise ErrorApi(403, "No tienes permiso para ver estas compras")
+    campos = _campos(CAMPOS_COMPRA)
+    despues = _entero("despues")
+    limite = _limite()
+
+    conexion = obtener_conexion_mysql()
+    cursor = conexion.cursor(dictionary=True)
+    # Paginación por id_venta descendente: las más recientes primero
+    if despues is None:
+        cursor.execute("""
+            SELECT id_venta, fecha, total FROM ventas
+            WHERE id_usuario = %s
+            ORDER BY id_venta DESC LIMIT %s
+        """, (id_usuario, limite + 1))
+    else:
+        cursor.execute("""
+            SELECT id_venta, fecha, total FROM ventas
+            WHERE id_usuario = %s AND id_venta < %s
+            ORDER BY id_venta DESC LIMIT %s
+        """, (id_usuario, despues, limite + 1))
+    filas = cursor.fetchall()
+    conexion.close()
+
+    pagina, siguiente = _pagina(filas, limite, "id_venta")
+    return _responder(lambda: {"datos": [_seleccionar(f, campos) for f in pagina], "siguiente": siguiente},
+                      privado=True)
+
+
+# ------------------ VENTAS ------------------
+def _ventas_con_detalles(ids):
+    """Ventas (con sus detalles) de la lista de ids, en el orden pedido."""
+    conexion = obtener_conexion_mysql()
+    cursor = conexion.cursor(dictionary=True)
+    marcadores = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"""
+        SELECT v.id_venta, v.id_usuario, u.nombre AS cliente, v.fecha, v.total
+        FROM ventas v
+        JOIN usuarios u ON v.id_usuario = u.id_usuario
+        WHERE v.id_venta IN ({marcadores})
+    """, tuple(ids))
+    ventas = {v["id_venta"]: dict(v, detalles=[]) for v in cursor.fetchall()}
+    if ventas:
+        # Solo los detalles de las ventas encontradas: detalle_ventas no tiene
+        # clave foránea y puede apuntar a ventas que ya no existen
+        encontradas = tuple(ventas)
+        marcadores = ", ".join(["%s"] * len(encontradas))
+        cursor.execute(f"""
+            SELECT dv.id_venta, dv.id_producto, p.nombre, dv.cantidad, dv.subtotal
+            FROM detalle_ventas dv
+            JOIN productos p ON dv.id_producto = p.id_producto
+            WHERE dv.id_venta IN ({marcadores})
+            ORDER BY dv.id_detalle
+        """, encontradas)
+        for d in cursor.fetchall():
+            ventas[d.pop("id_venta")]["detalles"].append(d)
+    conexion.close()
+
+    if not _es_personal():
+        ventas = {k: v for k, v in ventas.items() if v["id_usuario"] == current_user.id}
+    return [ventas[i] for i in ids if i in ventas]
+
+
+@api_v1.route("/ventas")
+def ventas():
+    _usuario_requerido()
+    ids = _ids()
+    if ids is None:
+        raise ErrorApi(400, "Indica las ventas con ?ids=1,2,3")
+    campos = _campos(CAMPOS_VENTA)
+    encontradas = _ventas_con_detalles(ids)
+    return _responder(lambda: {"datos": [_seleccionar(v, campos) for v in encontradas]}, privado=True)
+
+
+@api_v1.route("/ventas/<int:id_venta>")
+def venta(id_venta):
+    _usuario_requerido()
+    campos = _campos(CAMPOS_VENTA)
+    encontradas = _ventas_con_detalles([id_venta])
+    if not encontradas:
+        raise ErrorApi(404, "Venta no encontrada")
+    return _responder(lambda: _seleccionar(encontradas[0], campos), privado=True)
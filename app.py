@@ -2,7 +2,9 @@ from flask import Flask, render_template, request, redirect, url_for, flash
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from inventario.inventario import Inventario
-from conexion.conexion import obtener_conexion_mysql
+from inventario.catalogo import Catalogo, actualizar_catalogo
+from api.v1 import api_v1
+from conexion.conexion import obtener_conexion_mysql, consultar, consultar_en_paralelo
 from flask import session
 import os
 import json
@@ -46,8 +48,12 @@ DATA_FOLDER = "datos"
 TXT_FILE = os.path.join(DATA_FOLDER, "datos.txt")
 JSON_FILE = os.path.join(DATA_FOLDER, "datos.json")
 CSV_FILE = os.path.join(DATA_FOLDER, "datos.csv")
+CATALOGO_FILE = os.path.join(DATA_FOLDER, "catalogo.bin")
 os.makedirs(DATA_FOLDER, exist_ok=True)
 
+# Snapshot del catálogo compartido por todos los workers (ver inventario/catalogo.py)
+catalogo = Catalogo(CATALOGO_FILE)
+
 # ------------------ FUNCIONES AUXILIARES ------------------
 def sincronizar_archivos():
     productos = inv.obtener_productos()
@@ -63,6 +69,45 @@ def sincronizar_archivos():
         for p in productos:
             writer.writerow([p.nombre, p.cantidad, p.precio])
 
+def leer_filas_catalogo():
+    conexion = obtener_conexion_mysql()
+    if conexion is None:
+        raise RuntimeError("No se pudo conectar a MySQL para reconstruir el catálogo")
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute("SELECT id_producto, nombre, categoria, cantidad, precio, activo FROM productos")
+    filas = cursor.fetchall()
+    conexion.close()
+    return filas
+
+def refrescar_catalogo():
+    actualizar_catalogo(CATALOGO_FILE, leer_filas_catalogo)
+
+def intentar_refrescar_catalogo():
+    # Se llama después de un commit: si falla, la escritura ya se hizo y no
+    # debe convertirse en un error 500. Se borra el snapshot viejo para que
+    # nadie siga leyendo precios o stock desactualizados: obtener_catalogo()
+    # lo reconstruye en la siguiente lectura.
+    try:
+        refrescar_catalogo()
+    except Exception:
+        app.logger.exception("No se pudo reconstruir el catálogo")
+        try:
+            os.remove(CATALOGO_FILE)
+        except FileNotFoundError:
+            pass
+
+def obtener_catalogo():
+    if not catalogo.disponible():
+        refrescar_catalogo()
+    return catalogo
+
+app.extensions["catalogo"] = obtener_catalogo
+app.register_blueprint(api_v1)
+
+# El archivo sobrevive a los reinicios: se reconstruye al arrancar (también bajo
+# gunicorn, que no ejecuta __main__) por si la base cambió fuera de la app.
+intentar_refrescar_catalogo()
+
 def leer_txt():
     if not os.path.exists(TXT_FILE):
         return []
@@ -96,11 +141,7 @@ def leer_csv():
 # ------------------ RUTAS PÁGINAS ------------------
 @app.route("/")
 def index():
-    conexion = obtener_conexion_mysql()
-    cursor = conexion.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM productos")
-    productos = cursor.fetchall()
-    conexion.close()
+    productos = list(obtener_catalogo())
     return render_template("index.html", productos=productos)
 
 @app.route("/about")
@@ -118,22 +159,14 @@ def init_cart():
 @app.route("/productos", methods=["GET"])
 @login_required
 def productos_tienda():
-    conexion = obtener_conexion_mysql()
-    cursor = conexion.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM productos WHERE activo = 1 AND cantidad > 0")
-    productos = cursor.fetchall()
-    conexion.close()
+    productos = obtener_catalogo().en_tienda()
     return render_template("productos.html", productos=productos)
 
 # --- Agregar producto al carrito ---
 @app.route("/agregar_carrito/<int:id_producto>")
 @login_required
 def agregar_carrito(id_producto):
-    conexion = obtener_conexion_mysql()
-    cursor = conexion.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM productos WHERE id_producto=%s", (id_producto,))
-    producto = cursor.fetchone()
-    conexion.close()
+    producto = obtener_catalogo().obtener(id_producto)
 
     if producto:
         carrito = session.get("cart", [])
@@ -141,21 +174,21 @@ def agregar_carrito(id_producto):
         # Buscar si ya está en el carrito
         for item in carrito:
             if item["id_producto"] == id_producto:
-                if item["cantidad"] < producto["cantidad"]:  # Validar stock
+                if item["cantidad"] < producto.cantidad:  # Validar stock
                     item["cantidad"] += 1
-                    flash(f"{producto['nombre']} +1 en el carrito.", "info")
+                    flash(f"{producto.nombre} +1 en el carrito.", "info")
                 else:
                     flash("Stock Insuficiente.", "warning")
                 break
         else:
-            if producto["cantidad"] > 0:  # Solo agregar si hay stock
+            if producto.cantidad > 0:  # Solo agregar si hay stock
                 carrito.append({
-                    "id_producto": producto["id_producto"],
-                    "nombre": producto["nombre"],
-                    "precio": float(producto["precio"]),
+                    "id_producto": producto.id_producto,
+                    "nombre": producto.nombre,
+                    "precio": float(producto.precio),
                     "cantidad": 1
                 })
-                flash(f"{producto['nombre']} Agregado al Carrito. ✅", "success")
+                flash(f"{producto.nombre} Agregado al Carrito. ✅", "success")
             else:
                 flash("Producto sin stock disponible.", "danger")
 
@@ -180,12 +213,7 @@ def carrito():
 @login_required
 def actualizar_carrito(id_producto):
     nueva_cantidad = int(request.form.get("cantidad", 1))
-
-    conexion = obtener_conexion_mysql()
-    cursor = conexion.cursor(dictionary=True)
-    cursor.execute("SELECT cantidad FROM productos WHERE id_producto=%s", (id_producto,))
-    producto = cursor.fetchone()
-    conexion.close()
+    producto = obtener_catalogo().obtener(id_producto)
 
     carrito = session.get("cart", [])
     for item in carrito:
@@ -193,7 +221,7 @@ def actualizar_carrito(id_producto):
             if nueva_cantidad <= 0:
                 carrito.remove(item)  # Eliminar si es 0
                 flash("🗑️ Producto Eliminado del Carrito.", "warning")
-            elif nueva_cantidad <= producto["cantidad"]:  # Validar stock
+            elif nueva_cantidad <= producto.cantidad:  # Validar stock
                 item["cantidad"] = nueva_cantidad
                 flash("✅ Cantidad Actualizada en el Carrito.", "info")
             else:
@@ -253,6 +281,7 @@ def finalizar_compra():
     conexion.close()
 
     session["cart"] = []  # Vaciar carrito
+    intentar_refrescar_catalogo()  # El stock cambió
     flash("✅ ¡Compra Realizada con Éxito!", "success")
     return redirect(url_for("dashboard"))
 
@@ -272,6 +301,7 @@ def crear_producto():
                        (nombre, categoria, cantidad, precio))
         conexion.commit()
         conexion.close()
+        intentar_refrescar_catalogo()
         flash("✏️ Producto Agregado Correctamente.", "success")
         return redirect(url_for("dashboard"))
 
@@ -296,6 +326,7 @@ def editar_producto(id_producto):
         )
         conexion.commit()
         conexion.close()
+        intentar_refrescar_catalogo()
         flash("✏️ Producto Actualizado Correctamente.", "success")
         return redirect(url_for("productos"))
 
@@ -331,6 +362,7 @@ def actualizar(id_producto):
     conexion.commit()
     print(f"Filas afectadas: {cursor.rowcount}")
     conexion.close()
+    intentar_refrescar_catalogo()
 
     flash("✏️ Producto actualizado correctamente", "info")
     return redirect(url_for("dashboard"))
@@ -349,6 +381,7 @@ def eliminar_producto(id_producto):
     cursor.execute("UPDATE productos SET activo=0 WHERE id_producto=%s", (id_producto,))
     conexion.commit()
     conexion.close()
+    intentar_refrescar_catalogo()
     flash("🗑️ Producto marcado como inactivo", "info")
     return redirect(url_for("dashboard"))
 
@@ -425,51 +458,44 @@ def logout():
 
 
 # ------------------ Dashboard ------------------
+SQL_VENTAS = """
+    SELECT v.id_venta, u.nombre AS cliente, v.fecha, v.total
+    FROM ventas v
+    JOIN usuarios u ON v.id_usuario = u.id_usuario
+    ORDER BY v.fecha DESC
+"""
+
 @app.route("/dashboard")
 @login_required
 def dashboard():
-    conexion = obtener_conexion_mysql()
-    cursor = conexion.cursor(dictionary=True)
-
+    # Las consultas de cada rol son independientes: se lanzan a la vez con
+    # consultar_en_paralelo(). Van por conexiones distintas, así que las métricas
+    # (p. ej. el total de ventas) pueden no coincidir exactamente con las listas
+    # si hay una compra justo en ese momento.
     if current_user.rol == "Administrador":
-        # Métricas solo usuarios y productos activos
-        cursor.execute("SELECT COUNT(*) AS total FROM usuarios WHERE activo = 1")
-        total_usuarios = cursor.fetchone()["total"]
-        
-        cursor.execute("SELECT COUNT(*) AS total FROM productos WHERE activo = 1")
-        total_productos = cursor.fetchone()["total"]
-
-        cursor.execute("SELECT COUNT(*) AS total FROM ventas")
-        total_ventas = cursor.fetchone()["total"]
-
-        cursor.execute("SELECT IFNULL(SUM(total),0) AS ingresos FROM ventas")
-        ingresos = cursor.fetchone()["ingresos"]
-        
-        # Usuarios activos
-        cursor.execute("SELECT * FROM usuarios WHERE activo = 1")
-        usuarios = cursor.fetchall()
-        
-        # Productos activos
-        cursor.execute("SELECT * FROM productos WHERE activo = 1")
-        productos = cursor.fetchall()
-
-        # Ventas
-        cursor.execute("""
-            SELECT v.id_venta, u.nombre AS cliente, v.fecha, v.total
-            FROM ventas v
-            JOIN usuarios u ON v.id_usuario = u.id_usuario
-            ORDER BY v.fecha DESC
-        """)
-        ventas = cursor.fetchall()
-
-        conexion.close()
+        (
+            total_usuarios, total_productos, total_ventas, ingresos,
+            usuarios, productos, ventas
+        ) = consultar_en_paralelo(
+            # Métricas solo usuarios y productos activos
+            ("SELECT COUNT(*) AS total FROM usuarios WHERE activo = 1", (), True),
+            ("SELECT COUNT(*) AS total FROM productos WHERE activo = 1", (), True),
+            ("SELECT COUNT(*) AS total FROM ventas", (), True),
+            ("SELECT IFNULL(SUM(total),0) AS ingresos FROM ventas", (), True),
+            # Usuarios activos
+            ("SELECT * FROM usuarios WHERE activo = 1",),
+            # Productos activos
+            ("SELECT * FROM productos WHERE activo = 1",),
+            # Ventas
+            (SQL_VENTAS,),
+        )
         return render_template(
             "dashboard_admin.html",
             data={
-                "usuarios": total_usuarios,
-                "productos": total_productos,
-                "ventas": total_ventas,
-                "ingresos": ingresos,
+                "usuarios": total_usuarios["total"],
+                "productos": total_productos["total"],
+                "ventas": total_ventas["total"],
+                "ingresos": ingresos["ingresos"],
             },
             usuarios=usuarios,     # ✅ se envía al template
             productos=productos,
@@ -477,36 +503,22 @@ def dashboard():
         )
 
     elif current_user.rol == "Empleado":
-        # Productos
-        cursor.execute("SELECT * FROM productos")
-        productos = cursor.fetchall()
-
-        # Ventas
-        cursor.execute("""
-            SELECT v.id_venta, u.nombre AS cliente, v.fecha, v.total
-            FROM ventas v
-            JOIN usuarios u ON v.id_usuario = u.id_usuario
-            ORDER BY v.fecha DESC
-        """)
-        ventas = cursor.fetchall()
-
-        conexion.close()
+        productos, ventas = consultar_en_paralelo(
+            ("SELECT * FROM productos",),
+            (SQL_VENTAS,),
+        )
         return render_template("dashboard_empleado.html", productos=productos, ventas=ventas)
 
     elif current_user.rol == "Cliente":
         # Solo sus compras
-        cursor.execute("""
+        compras = consultar("""
             SELECT v.id_venta, v.fecha, v.total
             FROM ventas v
             WHERE v.id_usuario = %s
             ORDER BY v.fecha DESC
         """, (current_user.id,))
-        compras = cursor.fetchall()
-
-        conexion.close()
         return render_template("dashboard_cliente.html", compras=compras)
 
-    conexion.close()
     return redirect(url_for("index"))
 
 
@@ -532,35 +544,26 @@ def eliminar_usuario(id_usuario):
 @app.route("/detalle_venta/<int:id_venta>")
 @login_required
 def detalle_venta(id_venta):
-    conexion = obtener_conexion_mysql()
-    cursor = conexion.cursor(dictionary=True)
-
-    # Obtener la venta
-    cursor.execute("""
-        SELECT v.id_venta, v.fecha, v.total, u.nombre AS cliente
-        FROM ventas v
-        JOIN usuarios u ON v.id_usuario = u.id_usuario
-        WHERE v.id_venta = %s
-    """, (id_venta,))
-    venta = cursor.fetchone()
+    # La venta y sus productos se piden a la vez
+    venta, detalles = consultar_en_paralelo(
+        ("""
+            SELECT v.id_venta, v.fecha, v.total, u.nombre AS cliente
+            FROM ventas v
+            JOIN usuarios u ON v.id_usuario = u.id_usuario
+            WHERE v.id_venta = %s
+        """, (id_venta,), True),
+        ("""
+            SELECT dv.id_producto, p.nombre, dv.cantidad, dv.subtotal AS precio_unitario
+            FROM detalle_ventas dv
+            JOIN productos p ON dv.id_producto = p.id_producto
+            WHERE dv.id_venta = %s
+        """, (id_venta,)),
+    )
 
     if not venta:
-        conexion.close()
         flash("Venta no encontrada.", "danger")
         return redirect(url_for("dashboard"))
 
-    # Obtener los productos de la venta
-    cursor.execute("""
-        SELECT dv.id_producto, p.nombre, dv.cantidad, dv.subtotal AS precio_unitario 
-
-
-        FROM detalle_ventas dv
-        JOIN productos p ON dv.id_producto = p.id_producto
-        WHERE dv.id_venta = %s
-    """, (id_venta,))
-    detalles = cursor.fetchall()
-
-    conexion.close()
     return render_template("detalle_venta.html", venta=venta, detalles=detalles)
 
 # --- Eliminar venta ---
@@ -0,0 +1,128 @@
+"""
+Prueba de carga de /dashboard (rol Administrador) sin MySQL: cada consulta se
+simula con una latencia fija. Arranca gunicorn con workers sync y después con
+gthread (mismo número de workers) y mide peticiones por segundo y la memoria
+(RSS) de los workers. Solo Linux (lee /proc).
+
+Desde la raíz del proyecto:
+    python benchmark/carga_dashboard.py --latencia 0.02 --clientes 32 --peticiones 400
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+# ------------------ APP CON CONSULTAS SIMULADAS ------------------
+# gunicorn importa este módulo como benchmark.carga_dashboard:app
+def _crear_app():
+    import conexion.conexion
+    from flask_login import AnonymousUserMixin
+
+    latencia = float(os.environ.get("BENCH_LATENCIA", "0.02"))
+
+    def consulta_simulada(sql, parametros=(), uno=False):
+        time.sleep(latencia)
+        return {"total": 0, "ingresos": 0} if uno else []
+
+    # consultar_en_paralelo() busca consultar() en el módulo en cada llamada
+    conexion.conexion.consultar = consulta_simulada
+
+    from app import app as flask_app
+
+    class AdminBenchmark(AnonymousUserMixin):
+        id = 0
+        nombre = "Benchmark"
+        rol = "Administrador"
+
+    flask_app.config["LOGIN_DISABLED"] = True
+    flask_app.login_manager.anonymous_user = AdminBenchmark
+    return flask_app
+
+
+if __name__ != "__main__":
+    app = _crear_app()
+
+
+# ------------------ CARGA ------------------
+def _hijos(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def _rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for linea in f:
+            if linea.startswith("VmRSS:"):
+                return int(linea.split()[1])
+    return 0
+
+
+def _pedir(url):
+    with urllib.request.urlopen(url, timeout=60) as r:
+        r.read()
+        return r.status
+
+
+def medir(nombre, worker_class, hilos, args, puerto):
+    url = f"http://127.0.0.1:{puerto}/dashboard"
+    # Mismo pool en las dos pruebas: solo cambia cuántas peticiones atiende cada worker
+    env = dict(os.environ, BENCH_LATENCIA=str(args.latencia), GUNICORN_THREADS=str(hilos),
+               MYSQL_POOL_SIZE=str(args.pool))
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "--worker-class", worker_class, "--threads", str(hilos),
+         "--workers", str(args.workers), "--bind", f"127.0.0.1:{puerto}",
+         "--log-level", "error", "benchmark.carga_dashboard:app"],
+        cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                _pedir(url)
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError(f"gunicorn ({nombre}) no respondió")
+
+        with ThreadPoolExecutor(max_workers=args.clientes) as clientes:
+            inicio = time.perf_counter()
+            estados = list(clientes.map(_pedir, [url] * args.peticiones))
+            duracion = time.perf_counter() - inicio
+
+        rss = sum(_rss_kb(pid) for pid in _hijos(servidor.pid)) / 1024
+        errores = sum(1 for e in estados if e != 200)
+        print(f"{nombre:<24} {args.peticiones / duracion:>8.1f} req/s  "
+              f"{duracion:>6.2f} s  RSS workers {rss:>6.1f} MB  errores {errores}")
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencia", type=float, default=0.02, help="segundos por consulta simulada")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--hilos", type=int, default=8, help="hilos por worker en gthread")
+    parser.add_argument("--pool", type=int, default=16, help="conexiones simuladas por worker (MYSQL_POOL_SIZE)")
+    parser.add_argument("--clientes", type=int, default=32, help="peticiones simultáneas")
+    parser.add_argument("--peticiones", type=int, default=400)
+    parser.add_argument("--puerto", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.clientes} clientes, {args.peticiones} peticiones, "
+          f"7 consultas de {args.latencia * 1000:.0f} ms por petición")
+    medir("sync", "sync", 1, args, args.puerto)
+    medir(f"gthread ({args.hilos} hilos)", "gthread", args.hilos, args, args.puerto + 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,81 @@
 # conexion/conexion.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.pooling import MySQLConnectionPool
+
+CONFIG_MYSQL = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",  # Cambia si tu MySQL tiene contraseña
+    "database": "sweet_spot",
+}
+
+# Hilos por worker de gunicorn (gunicorn.conf.py exporta el valor que usa)
+HILOS_WORKER = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Conexiones reutilizables por proceso para consultar()/consultar_en_paralelo().
+# Por defecto dos por hilo del worker, para que un dashboard que lanza varias
+# consultas a la vez no deje sin conexión a las demás peticiones del mismo
+# worker. mysql.connector admite como máximo 32. Las demás rutas siguen
+# abriendo su propia conexión con obtener_conexion_mysql().
+TAMANO_POOL = min(32, int(os.environ.get("MYSQL_POOL_SIZE", HILOS_WORKER * 2)))
+
+_pool = None
+_pool_lock = threading.Lock()
+# El pool de mysql.connector falla en vez de esperar cuando se agota, así que
+# limitamos cuántos hilos lo usan a la vez.
+_cupos_pool = threading.BoundedSemaphore(TAMANO_POOL)
+# Hilos compartidos por todas las peticiones del proceso; las consultas
+# pendientes se atienden en orden de llegada.
+_ejecutor = ThreadPoolExecutor(max_workers=TAMANO_POOL, thread_name_prefix="consulta")
 
 def obtener_conexion_mysql():
     """
     Devuelve una conexión a la base de datos MySQL 'sweet_spot'.
     """
     try:
-        conexion = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",  # Cambia si tu MySQL tiene contraseña
-            database="sweet_spot"
-        )
+        conexion = mysql.connector.connect(**CONFIG_MYSQL)
         return conexion
     except Error as e:
         print(f"Error de conexión a MySQL: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MySQLConnectionPool(pool_name="sweet_spot", pool_size=TAMANO_POOL, **CONFIG_MYSQL)
+        return _pool
+
+def consultar(sql, parametros=(), uno=False):
+    """
+    Ejecuta una consulta SELECT con una conexión del pool y devuelve las filas
+    como diccionarios (o solo la primera si uno=True). Si MySQL no responde,
+    se propaga el error de mysql.connector.
+    """
+    with _cupos_pool:
+        conexion = _obtener_pool().get_connection()
+        try:
+            cursor = conexion.cursor(dictionary=True)
+            cursor.execute(sql, parametros)
+            return cursor.fetchone() if uno else cursor.fetchall()
+        finally:
+            conexion.close()  # Devuelve la conexión al pool
+
+
+def consultar_en_paralelo(*consultas):
+    """
+    Ejecuta varias consultas independientes a la vez, cada una con su propia
+    conexión del pool, y devuelve los resultados en el mismo orden.
+    Cada consulta es una tupla con los argumentos de consultar():
+    (sql,), (sql, parametros) o (sql, parametros, uno).
+
+    Al usar conexiones distintas, los resultados no salen de una misma
+    lectura consistente: un COUNT(*) puede no coincidir con una lista pedida
+    en paralelo si alguien escribe entre medias.
+    """
+    futuros = [_ejecutor.submit(consultar, *consulta) for consulta in consultas]
+    return [futuro.result() for futuro in futuros]
\ No newline at end of file
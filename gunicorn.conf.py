@@ -0,0 +1,12 @@
+# gunicorn.conf.py
+# gunicorn lo carga solo al ejecutar, desde la raíz del proyecto:
+#   gunicorn app:app
+# Las peticiones pasan casi todo el tiempo esperando a MySQL, así que cada
+# worker atiende varias a la vez con hilos (gthread) en lugar de una sola.
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+worker_class = "gthread"
+# Se exporta para que conexion.py dimensione el pool de MySQL con el mismo valor
+threads = int(os.environ.setdefault("GUNICORN_THREADS", "8"))
@@ -0,0 +1,229 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from .producto import Producto
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock, solo se serializan los hilos del proceso
+    fcntl = None
+
+# Formato del archivo:
+#   cabecera | registros de ancho fijo (ordenados por id_producto) | tabla de strings
+MAGIC = b"SSCT"
+FORMATO = 1
+CABECERA = struct.Struct("<4sIIQ")          # magic, formato, total, version
+REGISTRO = struct.Struct("<iiqIIIIB3x")     # id, cantidad, precio (centavos), nombre (off, len), categoria (off, len), activo
+
+
+def construir_catalogo(filas, ruta):
+    """
+    Escribe un snapshot del catálogo a partir de filas de 'productos' (diccionarios)
+    y lo reemplaza de forma atómica, para que los lectores nunca vean un archivo a medias.
+    """
+    filas = sorted(filas, key=lambda f: f["id_producto"])
+    inicio_strings = CABECERA.size + REGISTRO.size * len(filas)
+    registros = bytearray()
+    strings = bytearray()
+
+    for fila in filas:
+        nombre = (fila["nombre"] or "").encode("utf-8")
+        categoria = (fila.get("categoria") or "").encode("utf-8")
+        off_nombre = inicio_strings + len(strings)
+        strings += nombre
+        off_categoria = inicio_strings + len(strings)
+        strings += categoria
+        centavos = int((Decimal(str(fila["precio"])) * 100).to_integral_value())
+        registros += REGISTRO.pack(
+            fila["id_producto"], fila["cantidad"], centavos,
+            off_nombre, len(nombre), off_categoria, len(categoria),
+            1 if fila.get("activo", 1) else 0
+        )
+
+    version = time.time_ns()
+    # Nombre temporal único: varios hilos del mismo worker pueden construir a la vez
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(ruta) or ".", prefix=os.path.basename(ruta) + ".",
+                                     suffix=".tmp", delete=False) as f:
+        temporal = f.name
+        try:
+            f.write(CABECERA.pack(MAGIC, FORMATO, len(filas), version))
+            f.write(registros)
+            f.write(strings)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.remove(temporal)
+            raise
+    # NamedTemporaryFile crea el archivo con 0600; otros procesos también deben poder leerlo
+    os.chmod(temporal, 0o644)
+    os.replace(temporal, ruta)
+    return version
+
+
+_candado_local = threading.Lock()
+
+
+def actualizar_catalogo(ruta, leer_filas):
+    """
+    Lee las filas con leer_filas() y reconstruye el snapshot con un bloqueo
+    exclusivo sobre '<ruta>.lock'. Así quien lee la base de datos más tarde
+    es también quien escribe el archivo más tarde, y nunca queda un stock viejo.
+    """
+    with _candado_local, open(ruta + ".lock", "a") as candado:
+        if fcntl is not None:
+            fcntl.flock(candado, fcntl.LOCK_EX)
+        try:
+            return construir_catalogo(leer_filas(), ruta)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(candado, fcntl.LOCK_UN)
+
+
+class Snapshot:
+    """
+    Una versión concreta del catálogo: todas las lecturas salen del mismo
+    mapeo, así que la versión y los productos siempre corresponden entre sí.
+
+    Se recorre e indexa por posición (len, [i], [a:b], for), pero 'in' busca
+    por id_producto, igual que obtener(). No es una Sequence: no hay index()
+    ni count(), porque cada lectura crea un Producto nuevo.
+    """
+
+    def __init__(self, mapa):
+        self._mapa = mapa
+        _, _, self._total, self.version = CABECERA.unpack_from(mapa, 0)
+
+    def _leer(self, i):
+        (id_producto, cantidad, centavos, off_nombre, len_nombre,
+         off_categoria, len_categoria, activo) = REGISTRO.unpack_from(self._mapa, CABECERA.size + i * REGISTRO.size)
+        nombre = self._mapa[off_nombre:off_nombre + len_nombre].decode("utf-8")
+        categoria = self._mapa[off_categoria:off_categoria + len_categoria].decode("utf-8")
+        return Producto(id_producto, nombre, cantidad, centavos / 100, categoria, bool(activo))
+
+    def _id(self, i):
+        return struct.unpack_from("<i", self._mapa, CABECERA.size + i * REGISTRO.size)[0]
+
+    def _posicion(self, id_producto):
+        """Primera posición cuyo id_producto es >= al buscado (búsqueda binaria)."""
+        bajo, alto = 0, self._total
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._id(medio) < id_producto:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def _buscar(self, id_producto):
+        i = self._posicion(id_producto)
+        if i < self._total and self._id(i) == id_producto:
+            return i
+        return None
+
+    def __len__(self):
+        return self._total
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._leer(j) for j in range(*i.indices(self._total))]
+        if i < 0:
+            i += self._total
+        if not 0 <= i < self._total:
+            raise IndexError("índice fuera del catálogo")
+        return self._leer(i)
+
+    def __iter__(self):
+        for i in range(self._total):
+            yield self._leer(i)
+
+    def __contains__(self, id_producto):
+        if not isinstance(id_producto, int):
+            return False
+        return self._buscar(id_producto) is not None
+
+    def obtener(self, id_producto, default=None):
+        i = self._buscar(id_producto)
+        return default if i is None else self._leer(i)
+
+    def desde(self, despues=None):
+        """Productos con id_producto mayor que 'despues', en orden de id."""
+        inicio = 0 if despues is None else self._posicion(despues + 1)
+        for i in range(inicio, self._total):
+            yield self._leer(i)
+
+    def en_tienda(self):
+        """Productos activos y con stock, como los muestra la tienda."""
+        return [p for p in self if p.activo and p.cantidad > 0]
+
+
+class Catalogo:
+    """
+    Vista de solo lectura sobre el snapshot mapeado en memoria. Todos los workers
+    comparten las mismas páginas del archivo; si otro proceso lo reemplaza, se
+    vuelve a mapear en el siguiente acceso.
+
+    Ofrece las mismas lecturas que Snapshot. Cada llamada mira la versión
+    vigente; para varias lecturas coherentes entre sí, usar snapshot().
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._mapa = None
+        self._firma = None
+
+    def _vigente(self):
+        try:
+            st = os.stat(self.ruta)
+        except FileNotFoundError:
+            return None
+        firma = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if firma != self._firma:
+            with open(self.ruta, "rb") as f:
+                mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, formato, _, _ = CABECERA.unpack_from(mapa, 0)
+            if magic != MAGIC or formato != FORMATO:
+                mapa.close()
+                raise ValueError(f"Catálogo con formato no soportado: {self.ruta}")
+            # El mapa anterior no se cierra: otro hilo puede estar leyéndolo y
+            # se libera solo cuando deja de tener referencias.
+            self._mapa, self._firma = mapa, firma
+        return self._mapa
+
+    def disponible(self):
+        return self._vigente() is not None
+
+    def snapshot(self):
+        mapa = self._vigente()
+        if mapa is None:
+            raise FileNotFoundError(f"No existe el catálogo: {self.ruta}")
+        return Snapshot(mapa)
+
+    @property
+    def version(self):
+        return self.snapshot().version
+
+    def __len__(self):
+        return len(self.snapshot())
+
+    def __getitem__(self, i):
+        return self.snapshot()[i]
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def __contains__(self, id_producto):
+        return id_producto in self.snapshot()
+
+    def obtener(self, id_producto, default=None):
+        return self.snapshot().obtener(id_producto, default)
+
+    def desde(self, despues=None):
+        return self.snapshot().desde(despues)
+
+    def en_tienda(self):
+        return self.snapshot().en_tienda()
@@ -1,9 +1,11 @@
 class Producto:
-    def __init__(self, id_producto, nombre, cantidad, precio):
+    def __init__(self, id_producto, nombre, cantidad, precio, categoria="", activo=True):
         self.id_producto = id_producto
         self.nombre = nombre
         self.cantidad = cantidad
         self.precio = precio
+        self.categoria = categoria
+        self.activo = activo
 
     def __str__(self):
         return f"{self.nombre} | Cantidad: {self.cantidad} | Precio: ${self.precio:.2f}"